@@ -179,18 +179,14 @@ class DataSet:
         if excluded is None:
             excluded = []
 
-        included = [_.lower() for _ in included]
-        excluded = [_.lower() for _ in excluded]
-
-        datasets_new = []
-
-        for dataset in self.datasets:
-            name = dataset.name
-
-            if name in included and name not in excluded:
-                datasets_new.append(dataset)
-
-        self.datasets = datasets_new
+        included = frozenset(_.lower() for _ in included)
+        excluded = frozenset(_.lower() for _ in excluded)
+
+        self.datasets = [
+            dataset
+            for dataset in self.datasets
+            if dataset.name in included and dataset.name not in excluded
+        ]
 
     def make_bs_dataset(self):
         """Create a new dataset to run a bootstrap simulation."""
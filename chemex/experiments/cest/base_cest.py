@@ -22,6 +22,12 @@ _EXP_DETAILS = {
     "filter_bandwidths": {"default": 0.0, "type": float},
 }
 
+# Maximal number of B1 offsets calculated at once. The Liouvillian stacks grow
+# with the number of offsets (times the B1 and coupling distributions), so the
+# offsets are processed in blocks to keep the memory bounded (e.g., the 500
+# points of the plotted profiles)
+OFFSET_BLOCK = 32
+
 
 class ProfileCEST(BaseProfile):
     """CESTProfile class."""
@@ -63,6 +69,18 @@ class ProfileCEST(BaseProfile):
 
         return 2.0 * np.pi * b1_offsets / self.ppms_i + self.carrier
 
+    def iter_offset_blocks(self, carriers_i, reference):
+        """Set the carriers of the irradiated points in blocks of at most
+        OFFSET_BLOCK offsets, yielding the indexes of each block."""
+
+        indexes = np.flatnonzero(~reference)
+
+        for start in range(0, indexes.size, OFFSET_BLOCK):
+            stop = start + OFFSET_BLOCK
+            block = indexes[start:stop]
+            self.liouv.carrier_i = carriers_i[block]
+            yield block
+
     def print_profile(self, params=None):
         """Print the CEST profile."""
         output = []
@@ -168,14 +186,19 @@ class ProfileCEST(BaseProfile):
             -1
         )
 
-        for offset, bandwidth in zip(filter_offsets, filter_bandwidths):
-            nu_offsets = (
-                (cs_a - self.carrier) * self.ppms_i / (2.0 * np.pi)
-                - self.data["offsets"]
-                + offset
-            )
+        # All the filtered regions are evaluated at once: one row per region
+        size = min(filter_offsets.size, filter_bandwidths.size)
+        filter_offsets = filter_offsets[:size].reshape(-1, 1)
+        filter_bandwidths = filter_bandwidths[:size].reshape(-1, 1)
+
+        nu_offsets = (
+            (cs_a - self.carrier) * self.ppms_i / (2.0 * np.pi)
+            - self.data["offsets"]
+            + filter_offsets
+        )
 
-            self.mask = np.logical_and(self.mask, abs(nu_offsets) > bandwidth * 0.5)
+        outside = abs(nu_offsets) > filter_bandwidths * 0.5
+        self.mask = np.logical_and(self.mask, outside.all(axis=0))
 
     def get_plot_fig(self, params):
 
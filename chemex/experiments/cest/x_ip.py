@@ -91,15 +91,12 @@ class ProfileCESTXIP(ProfileCEST):
 
         mag0 = self.liouv.compute_mag_eq(params_local, term="iz")
 
-        profile = []
-
-        for ref, carrier_i in zip(reference, carriers_i):
-            self.liouv.carrier_i = carrier_i
-            if not ref:
-                cest = self.liouv.pulse_i(self.time_t1, 0.0, self.dephasing)
-            else:
-                cest = self.liouv.identity
-            mag = self.liouv.collapse(self.detect @ cest @ mag0)
-            profile.append(mag)
-
-        return np.asarray(profile)
+        # The reference points are not irradiated, the other B1 offsets are
+        # calculated by blocks
+        profile = np.full(len(carriers_i), self.liouv.collapse(self.detect @ mag0))
+
+        for block in self.iter_offset_blocks(carriers_i, reference):
+            mag = self.liouv.pulse_i(self.time_t1, 0.0, self.dephasing, mag0)
+            profile[block] = self.liouv.collapse_offsets(self.detect @ mag)
+
+        return profile
@@ -74,20 +74,17 @@ class ProfileCESTXIPDANTE(ProfileCEST):
 
         mag0 = self.liouv.compute_mag_eq(params_local, term="iz")
 
-        profile = []
+        # The reference points are not irradiated, the other B1 offsets are
+        # calculated by blocks
+        profile = np.full(len(carriers_i), self.liouv.collapse(self.detect @ mag0))
 
-        for ref, carrier_i in zip(reference, carriers_i):
-            self.liouv.carrier_i = carrier_i
-            if not ref:
-                p_delay = self.liouv.delays(self.tau_dante)
-                p_pulse = self.liouv.pulse_i(self.pw_dante, 0.0)
-                dcest = np.linalg.matrix_power(p_pulse @ p_delay, self.ncyc_dante)
-            else:
-                dcest = self.liouv.identity
-            mag = self.liouv.collapse(self.detect @ dcest @ mag0)
-            profile.append(mag)
+        for block in self.iter_offset_blocks(carriers_i, reference):
+            p_delay = self.liouv.delays(self.tau_dante)
+            p_pulse = self.liouv.pulse_i(self.pw_dante, 0.0)
+            dcest = np.linalg.matrix_power(p_pulse @ p_delay, self.ncyc_dante)
+            profile[block] = self.liouv.collapse_offsets(self.detect @ dcest @ mag0)
 
-        return np.asarray(profile)
+        return profile
 
     def filter_points(self, params=None):
         """Evaluate some criteria to know whether or not the point should be
@@ -100,14 +97,19 @@ class ProfileCESTXIPDANTE(ProfileCEST):
             -1
         )
 
-        for offset, bandwidth in zip(filter_offsets, filter_bandwidths):
-            nu_offsets = (
-                (cs_a - self.carrier) * self.ppms_i / (2.0 * np.pi)
-                - self.data["offsets"]
-                + offset
-            )
-            nu_offsets = (
-                nu_offsets + 0.5 * self.sw_dante
-            ) % self.sw_dante - 0.5 * self.sw_dante
-
-            self.mask = np.logical_and(self.mask, abs(nu_offsets) > bandwidth * 0.5)
+        # All the filtered regions are evaluated at once: one row per region
+        size = min(filter_offsets.size, filter_bandwidths.size)
+        filter_offsets = filter_offsets[:size].reshape(-1, 1)
+        filter_bandwidths = filter_bandwidths[:size].reshape(-1, 1)
+
+        nu_offsets = (
+            (cs_a - self.carrier) * self.ppms_i / (2.0 * np.pi)
+            - self.data["offsets"]
+            + filter_offsets
+        )
+        nu_offsets = (
+            nu_offsets + 0.5 * self.sw_dante
+        ) % self.sw_dante - 0.5 * self.sw_dante
+
+        outside = abs(nu_offsets) > filter_bandwidths * 0.5
+        self.mask = np.logical_and(self.mask, outside.all(axis=0))
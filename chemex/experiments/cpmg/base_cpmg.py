@@ -52,6 +52,24 @@ class ProfileCPMG1(BaseProfile):
 
         return ncycs / self.time_t2
 
+    def _fill_profile(self, calculate):
+        """Calculate the profile from the magnetization returned by
+        calculate(ncyc).
+
+        Duplicated ncyc values are only calculated once. The parts of the
+        sequence that do not depend on ncyc are expected to be calculated
+        beforehand, outside of calculate.
+        """
+
+        collapse = self.liouv.collapse
+        ncycs, inverse = np.unique(self.data["ncycs"], return_inverse=True)
+        profile = np.empty(ncycs.size)
+
+        for index, ncyc in enumerate(ncycs):
+            profile[index] = collapse(calculate(ncyc))
+
+        return profile[inverse]
+
     def print_profile(self, params=None):
         """Print the CPMG profile."""
         output = []
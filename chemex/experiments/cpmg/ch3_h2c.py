@@ -79,18 +79,9 @@ class ProfileCPMGCH3H2C(ProfileCPMG2):
             cp1[ncyc] = cp_trains[0] @ d_neg
             cp2[ncyc] = d_neg @ cp_trains[1]
 
-        profile = [
-            self.liouv.collapse(
-                self.detect
-                @ d_eq
-                @ p90[1]
-                @ cp2[ncyc]
-                @ palmer
-                @ cp1[ncyc]
-                @ p90[0]
-                @ mag0
-            )
-            for ncyc in self.data["ncycs"]
-        ]
-
-        return np.asarray(profile)
+        detect = self.detect @ d_eq @ p90[1]
+        mag_start = p90[0] @ mag0
+
+        return self._fill_profile(
+            lambda ncyc: detect @ cp2[ncyc] @ palmer @ cp1[ncyc] @ mag_start
+        )
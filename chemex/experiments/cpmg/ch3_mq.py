@@ -21,7 +21,6 @@ Reference
 Journal of the American Chemical Society (2004), 126, 3964-73
 
 """
-import numpy as np
 from numpy import linalg as la
 
 from chemex.experiments.cpmg.base_cpmg import ProfileCPMG1
@@ -81,9 +80,4 @@ class ProfileCPMGCH3MQ(ProfileCPMG1):
             cp_train = la.matrix_power(echo, int(ncyc))
             cp[ncyc] = cp_train @ p180_sx @ cp_train
 
-        profile = [
-            self.liouv.collapse(self.detect @ cp[ncyc] @ mag0)
-            for ncyc in self.data["ncycs"]
-        ]
-
-        return np.asarray(profile)
+        return self._fill_profile(lambda ncyc: self.detect @ cp[ncyc] @ mag0)
@@ -97,18 +97,9 @@ class ProfileCPMGCOAP(ProfileCPMG2):
             cp_train = la.matrix_power(echo, int(ncyc))
             cp[ncyc] = d_neg @ cp_train @ d_neg
 
-        profile = [
-            self.liouv.collapse(
-                self.detect
-                @ d_eq
-                @ p90[1]
-                @ cp[ncyc]
-                @ p_flip
-                @ cp[ncyc]
-                @ p90[1]
-                @ mag0
-            )
-            for ncyc in self.data["ncycs"]
-        ]
-
-        return np.asarray(profile)
+        detect = self.detect @ d_eq @ p90[1]
+        mag_start = p90[1] @ mag0
+
+        return self._fill_profile(
+            lambda ncyc: detect @ cp[ncyc] @ p_flip @ cp[ncyc] @ mag_start
+        )
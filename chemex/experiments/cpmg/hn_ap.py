@@ -72,18 +72,9 @@ class ProfileCPMGHNAP(ProfileCPMG2):
             cp1[ncyc] = cp_train @ d_neg
             cp2[ncyc] = d_neg @ cp_train
 
-        profile = [
-            self.liouv.collapse(
-                self.detect
-                @ d_eq
-                @ p90[0]
-                @ cp2[ncyc]
-                @ p180pmx
-                @ cp1[ncyc]
-                @ p90[0]
-                @ mag0
-            )
-            for ncyc in self.data["ncycs"]
-        ]
-
-        return np.asarray(profile)
+        detect = self.detect @ d_eq @ p90[0]
+        mag_start = p90[0] @ mag0
+
+        return self._fill_profile(
+            lambda ncyc: detect @ cp2[ncyc] @ p180pmx @ cp1[ncyc] @ mag_start
+        )
@@ -127,18 +127,9 @@ class ProfileCPMGNTROSY(ProfileCPMG2):
             cp_trains = la.matrix_power(echo, int(ncyc))
             cp1[ncyc], cp2[ncyc] = d_neg @ cp_trains @ d_neg
 
-        profile = [
-            self.liouv.collapse(
-                self.detect
-                @ d_eq
-                @ p90[1]
-                @ cp2[ncyc]
-                @ palmer
-                @ cp1[ncyc]
-                @ p90[0]
-                @ mag0
-            )
-            for ncyc in self.data["ncycs"]
-        ]
+        detect = self.detect @ d_eq @ p90[1]
+        mag_start = p90[0] @ mag0
 
-        return np.asarray(profile)
+        return self._fill_profile(
+            lambda ncyc: detect @ cp2[ncyc] @ palmer @ cp1[ncyc] @ mag_start
+        )
@@ -165,10 +165,11 @@ class ProfileCPMGNTROSY0013(ProfileCPMG2):
             cp2[ncyc] = cp_trains[[2, 3]]
 
         # Make profile
-        profile = [
-            self.liouv.collapse(
-                self.detect
-                @ d_eq
+        detect = self.detect @ d_eq
+
+        return self._fill_profile(
+            lambda ncyc: (
+                detect
                 @ delta[ncyc]
                 @ p90[3]
                 @ cp2[ncyc]
@@ -178,10 +179,7 @@ class ProfileCPMGNTROSY0013(ProfileCPMG2):
                 @ delta[ncyc]
                 @ mag0
             )
-            for ncyc in self.data["ncycs"]
-        ]
-
-        return np.asarray(profile)
+        )
 
     def _get_mag0(self, params_local):
 
@@ -9,13 +9,12 @@ def read_profiles(path, filenames, details, model):
 
     details["name"] = name_experiment(details)
     Profile = experiments.grab(details["type"])
-    dtype = [("ncycs", "i4"), ("intensity", "f8"), ("error", "f8")]
 
     profiles = []
 
     for profile_name, filename in filenames.items():
         full_path = path / filename
-        data = np.loadtxt(full_path, dtype=dtype)
+        data = np.loadtxt(full_path, dtype=Profile.DTYPE)
         profiles.append(Profile(profile_name, data, details, model))
 
     error = details.get("error", "file")
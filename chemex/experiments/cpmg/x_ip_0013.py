@@ -126,11 +126,9 @@ class ProfileCPMGXIP0013(ProfileCPMG2):
             cp[ncyc] = d_neg @ np.array(cp[ncyc]) @ d_neg
 
         # Make profile
-        profile = [
-            self.liouv.collapse(
-                self.detect @ d_eq @ delta[ncyc] @ p90[3] @ cp[ncyc] @ p90[1] @ mag0
-            )
-            for ncyc in self.data["ncycs"]
-        ]
+        detect = self.detect @ d_eq
+        mag_start = p90[1] @ mag0
 
-        return np.asarray(profile)
+        return self._fill_profile(
+            lambda ncyc: detect @ delta[ncyc] @ p90[3] @ cp[ncyc] @ mag_start
+        )
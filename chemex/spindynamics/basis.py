@@ -8,12 +8,15 @@
         2IzSz}
 """
 import itertools
+from functools import lru_cache
 
 import numpy as np
 from scipy import linalg
+from scipy import sparse
 from scipy import stats
 
 from chemex.spindynamics import constants
+from chemex.spindynamics import pade
 
 COMPONENTS = {
     name: index
@@ -74,6 +77,11 @@ ZEROS_M_FULL = np.zeros((N_FULL, N_FULL))
 ZEROS_V_SINGLE = np.zeros((N_SINGLE, 1))
 ZEROS_V_FULL = np.zeros((N_FULL, 1))
 
+# Maximal number of Liouvillians exponentiated at once. The Padé approximants
+# and the eigen-decompositions create several copies of the stack (complex for
+# the latter), so large stacks are processed in blocks
+STACK_BLOCK = 256
+
 
 class Liouvillian:
     """TODO"""
@@ -91,16 +99,36 @@ class Liouvillian:
         self._vectors, matrices = build_basis(system, state_nb, equilibrium)
         self._matrices = add_cs_and_carrier(matrices, self.ppms)
 
+        # The free Liouvillian is linear in the parameters: stack the reference
+        # matrices so that it is obtained from a single contraction. Each of them
+        # only has a few non-zero elements, the stack is thus stored as a sparse
+        # matrix (less than 1% dense for the larger bases)
+        self._indexes = {name: index for index, name in enumerate(self._matrices)}
+        stack = np.array(list(self._matrices.values()))
+        self._stack = sparse.csr_matrix(stack.reshape(len(self._indexes), -1).T)
+
         self.identity = np.identity(self._matrices["cs_i_a"].shape[-1])
 
         self.detect = {name: vector.T for name, vector in self._vectors.items()}
 
         self.perfect180 = make_perfect180(self._vectors)
 
+        self._mag_eq = lru_cache(64)(self._calculate_mag_eq)
+
+        # The matrices scaled by the carriers, B1 fields and couplings are
+        # constant: look them up once rather than every time a setter is called
+        self._m_carrier_i = self._matrices.get("carrier_i", 0.0)
+        self._m_carrier_s = self._matrices.get("carrier_s", 0.0)
+        self._m_w1x_i = self._matrices.get("w1x_i", 0.0)
+        self._m_w1y_i = self._matrices.get("w1y_i", 0.0)
+        self._m_w1x_s = self._matrices.get("w1x_s", 0.0)
+        self._m_w1y_s = self._matrices.get("w1y_s", 0.0)
+        self._m_j_eff_i = self._matrices.get("j_eff_i", 0.0)
+
         self._carrier_i = None
         self._carrier_s = None
         self._j_eff_i = None
-        self._j_eff_i_weights = None
+        self._j_eff_i_weights = 1.0
         self._l_carrier_i = None
         self._l_carrier_s = None
         self._l_j_eff_i = None
@@ -112,6 +140,7 @@ class Liouvillian:
         self._w1_s_inh = 0.0
         self._w1_i_inh_res = 11
         self._w1_s_inh_res = 11
+        self._buffer = None
 
         self.update((("cs_i_a", 0.0),))
         self.carrier_i = 0.0
@@ -133,8 +162,12 @@ class Liouvillian:
 
     @carrier_i.setter
     def carrier_i(self, value):
+        # Several carriers can be set at once (e.g., a block of the B1 offsets of
+        # a CEST profile). The Liouvillian stacks are laid out as
+        # (j, offsets, b1, N, N): the carriers are broadcast along axis -4,
+        # between the coupling (axis -5) and the B1 (axis -3) distributions
         self._carrier_i = np.asarray(value)
-        self._l_carrier_i = self._matrices.get("carrier_i", 0.0) * self._carrier_i
+        self._l_carrier_i = self._m_carrier_i * self._carrier_i.reshape(-1, 1, 1, 1)
 
     @property
     def carrier_s(self):
@@ -143,7 +176,7 @@ class Liouvillian:
     @carrier_s.setter
     def carrier_s(self, value):
         self._carrier_s = np.asarray(value)
-        self._l_carrier_s = self._matrices.get("carrier_s", 0.0) * self._carrier_s
+        self._l_carrier_s = self._m_carrier_s * self._carrier_s
 
     @property
     def w1_i(self):
@@ -167,9 +200,10 @@ class Liouvillian:
 
         self._w1_i_weights = stats.norm.pdf(dist)
         self._w1_i_weights /= self._w1_i_weights.sum()
+        self._update_weights()
 
-        self._l_w1x_i = self._matrices.get("w1x_i", 0.0) * w1_i_dist
-        self._l_w1y_i = self._matrices.get("w1y_i", 0.0) * w1_i_dist
+        self._l_w1x_i = self._m_w1x_i * w1_i_dist
+        self._l_w1y_i = self._m_w1y_i * w1_i_dist
 
     @property
     def w1_i_inh(self):
@@ -211,9 +245,10 @@ class Liouvillian:
 
         self._w1_s_weights = stats.norm.pdf(dist)
         self._w1_s_weights /= self._w1_s_weights.sum()
+        self._update_weights()
 
-        self._l_w1x_s = self._matrices.get("w1x_s", 0.0) * w1_s_dist
-        self._l_w1y_s = self._matrices.get("w1y_s", 0.0) * w1_s_dist
+        self._l_w1x_s = self._m_w1x_s * w1_s_dist
+        self._l_w1y_s = self._m_w1y_s * w1_s_dist
 
     @property
     def w1_s_inh(self):
@@ -240,7 +275,7 @@ class Liouvillian:
     @j_eff_i.setter
     def j_eff_i(self, value):
         self._j_eff_i = np.asarray(value).reshape(-1, 1, 1, 1, 1)
-        self._l_j_eff_i = self._matrices.get("j_eff_i", 0.0) * self._j_eff_i
+        self._l_j_eff_i = self._m_j_eff_i * self._j_eff_i
 
     @property
     def j_eff_i_weights(self):
@@ -249,55 +284,105 @@ class Liouvillian:
     @j_eff_i_weights.setter
     def j_eff_i_weights(self, value):
         self._j_eff_i_weights = np.asarray(value).reshape(-1, 1, 1, 1, 1)
+        self._update_weights()
+
+    def _update_weights(self):
+        """Flatten the weights of the B1 and coupling distributions once, in the
+        same order as the propagator stacks."""
+        weights = self._w1_i_weights * self._w1_s_weights * self._j_eff_i_weights
+        self._weights = np.asarray(weights).reshape(-1)
 
     def compute_mag_eq(self, parvals, term="iz"):
+        # Only the populations matter here, so the result can be reused across
+        # calls where other parameters changed (e.g., most of the Jacobian)
         parvals_ = dict(parvals)
+        populations = tuple(parvals_.get(name2, 0.0) for _, name2 in POP_PAIRS[term])
+        return np.array(self._mag_eq(term, populations))
+
+    def _calculate_mag_eq(self, term, populations):
         return sum(
-            self._vectors.get(name1, 0.0) * parvals_.get(name2, 0.0)
-            for name1, name2 in POP_PAIRS[term]
+            self._vectors.get(name1, 0.0) * population
+            for (name1, _), population in zip(POP_PAIRS[term], populations)
         )
 
     def update(self, parvals):
-        self._l_free = sum(
-            self._matrices[name] * parval
-            for name, parval in parvals
-            if name in self._matrices
-        )
+        values = np.zeros(len(self._indexes))
+        for name, parval in parvals:
+            if name in self._indexes:
+                values[self._indexes[name]] += parval
+        self._l_free = (self._stack @ values).reshape(self.identity.shape)
 
     def collapse(self, vector):
-        weights = (
-            self._w1_i_weights * self._w1_s_weights * self._j_eff_i_weights
-        ).reshape(-1, 1, 1)
-        vector_ = vector.reshape(-1, *vector.shape[-2:])
-        return (vector_ * weights).sum()
+        vector_ = vector.reshape(-1)
+        if vector_.size == self._weights.size:
+            return self._weights @ vector_
+        # A magnetization without the distribution axes, or no distribution
+        # (all the values are then summed, e.g., phase cycles)
+        if vector_.size == 1 or self._weights.size == 1:
+            return vector_.sum() * self._weights.sum()
+        raise ValueError(
+            f"Cannot collapse {vector.shape} with {self._weights.size} weights"
+        )
+
+    def collapse_offsets(self, vector):
+        """Same as collapse, but returns one value per carrier set with carrier_i."""
+        vector_ = np.moveaxis(vector, -4, 0)
+        vector_ = vector_.reshape(len(vector_), -1)
+        if vector_.shape[1] == self._weights.size:
+            return vector_ @ self._weights
+        if vector_.shape[1] == 1 or self._weights.size == 1:
+            return vector_.sum(axis=1) * self._weights.sum()
+        raise ValueError(
+            f"Cannot collapse {vector.shape} with {self._weights.size} weights"
+        )
+
+    def _sum_terms(self, *terms):
+        """Sum the Liouvillian terms into a scratch buffer reused across calls.
+
+        The buffer is only handed over to calculate_propagators, which does not
+        keep any reference to it. It is kept flat and only grows, so that calls
+        with different shapes (e.g., the last block of offsets of a CEST profile,
+        or delays without the B1 distribution) reuse it as well.
+        """
+        shape = np.broadcast(*terms).shape
+        size = int(np.prod(shape))
+        if self._buffer is None or self._buffer.size < size:
+            self._buffer = np.empty(size)
+        liouv = self._buffer[:size].reshape(shape)
+        liouv[...] = terms[0]
+        for term in terms[1:]:
+            liouv += term
+        return liouv
 
     def delays(self, times):
-        liouv = self._l_free + self._l_carrier_i + self._l_carrier_s + self._l_j_eff_i
+        liouv = self._sum_terms(
+            self._l_free, self._l_carrier_i, self._l_carrier_s, self._l_j_eff_i
+        )
         return calculate_propagators(liouv, times)
 
-    def pulse_i(self, times, phase, dephasing=False):
+    def pulse_i(self, times, phase, dephasing=False, mag0=None):
         l_w1_i = self._l_w1x_i * np.cos(phase * np.pi * 0.5) + self._l_w1y_i * np.sin(
             phase * np.pi * 0.5
         )
 
-        liouv = (
-            self._l_free
-            + self._l_carrier_i
-            + self._l_carrier_s
-            + self._l_j_eff_i
-            + l_w1_i
+        liouv = self._sum_terms(
+            self._l_free,
+            self._l_carrier_i,
+            self._l_carrier_s,
+            self._l_j_eff_i,
+            l_w1_i,
         )
 
-        return calculate_propagators(liouv, times, dephasing)
+        return calculate_propagators(liouv, times, dephasing, mag0)
 
     def pulses_90_180_i(self):
         pulses = {}
-        liouv = (
-            self._l_free
-            + self._l_carrier_i
-            + self._l_carrier_s
-            + self._l_j_eff_i
-            + self._l_w1x_i
+        liouv = self._sum_terms(
+            self._l_free,
+            self._l_carrier_i,
+            self._l_carrier_s,
+            self._l_j_eff_i,
+            self._l_w1x_i,
         )
         t90 = 0.5 * np.pi / self._w1_i
         pulses["90px"] = calculate_propagators(liouv, t90)
@@ -315,18 +400,18 @@ class Liouvillian:
         l_w1_s = self._l_w1x_s * np.cos(phase * np.pi * 0.5) + self._l_w1y_s * np.sin(
             phase * np.pi * 0.5
         )
-        liouv = (
-            self._l_free
-            + self._l_carrier_i
-            + self._l_carrier_s
-            + self._l_j_eff_i
-            + l_w1_s
+        liouv = self._sum_terms(
+            self._l_free,
+            self._l_carrier_i,
+            self._l_carrier_s,
+            self._l_j_eff_i,
+            l_w1_s,
         )
         return calculate_propagators(liouv, times, dephasing)
 
     def pulses_90_180_s(self):
         pulses = {}
-        liouv = self._l_free + self._l_j_eff_i + self._l_w1x_s
+        liouv = self._sum_terms(self._l_free, self._l_j_eff_i, self._l_w1x_s)
         t90 = 0.5 * np.pi / self._w1_s
         rot90zp, rot90zm = self._rot90zp_s, self._rot90zm_s
         pulses["90px"] = calculate_propagators(liouv, t90)
@@ -339,22 +424,22 @@ class Liouvillian:
         pulses["180my"] = pulses["90my"] @ pulses["90my"]
         return pulses
 
-    def pulse_is(self, times, phase_i, phase_s, dephasing=False):
+    def pulse_is(self, times, phase_i, phase_s, dephasing=False, mag0=None):
         l_w1_i = self._l_w1x_i * np.cos(phase_i * np.pi * 0.5) + self._l_w1y_i * np.sin(
             phase_i * np.pi * 0.5
         )
         l_w1_s = self._l_w1x_s * np.cos(phase_s * np.pi * 0.5) + self._l_w1y_s * np.sin(
             phase_s * np.pi * 0.5
         )
-        liouv = (
-            self._l_free
-            + self._l_carrier_i
-            + self._l_carrier_s
-            + self._l_j_eff_i
-            + l_w1_i
-            + l_w1_s
+        liouv = self._sum_terms(
+            self._l_free,
+            self._l_carrier_i,
+            self._l_carrier_s,
+            self._l_j_eff_i,
+            l_w1_i,
+            l_w1_s,
         )
-        return calculate_propagators(liouv, times, dephasing)
+        return calculate_propagators(liouv, times, dephasing, mag0)
 
 
 def build_4st_is_spin_system():
@@ -459,7 +544,14 @@ def build_4st_is_spin_system():
     return vectors, matrices
 
 
+@lru_cache(maxsize=None)
 def build_basis(spin_system, state_nb, equilibrium=True):
+    """Build the vectors and matrices of the reduced basis.
+
+    The basis only depends on the spin system, the number of states and the
+    equilibrium flag, so it is built once for all the profiles sharing them:
+    the returned arrays are read-only.
+    """
     vectors, matrices = build_4st_is_spin_system()
 
     active_indexes = (
@@ -488,6 +580,9 @@ def build_basis(spin_system, state_nb, equilibrium=True):
         if not (m_invalid or k_invalid):
             mat_reduced[name] = matrix[mesh]
 
+    for array in itertools.chain(vec_reduced.values(), mat_reduced.values()):
+        array.setflags(write=False)
+
     return vec_reduced, mat_reduced
 
 
@@ -514,29 +609,66 @@ def add_cs_and_carrier(matrices, ppms):
     return matrices_
 
 
-def calculate_propagators(liouvillian, delays, dephasing=False):
-    """TODO: function docstring."""
+def calculate_propagators(liouvillian, delays, dephasing=False, mag0=None):
+    """Calculate the propagators for all the delays.
+
+    When the starting magnetization mag0 is given, only the propagated
+    magnetization is returned. The eigenvectors are then not inverted: mag0 is
+    expressed in the eigenbasis with a linear solve instead.
+
+    The stack of Liouvillians is processed in blocks of at most STACK_BLOCK
+    matrices, which bounds the size of the temporary arrays.
+    """
 
     delays_ = np.asarray(delays).reshape(-1)
-    shape = liouvillian.shape
 
-    propagators = []
+    size = liouvillian.shape[-1]
+    columns = size if mag0 is None else mag0.shape[-1]
+    liouvillians = liouvillian.reshape(-1, size, size)
+
+    propagators = np.empty((delays_.size, len(liouvillians), size, columns))
+
+    for start in range(0, len(liouvillians), STACK_BLOCK):
+        stop = start + STACK_BLOCK
+        propagators[:, start:stop] = _calculate_propagator_block(
+            liouvillians[start:stop], delays_, dephasing, mag0
+        )
+
+    return propagators.reshape(delays_.size, *liouvillian.shape[:-2], size, columns)
+
+
+def _calculate_propagator_block(liouvillians, delays, dephasing, mag0):
+    """Calculate the propagators of a block of Liouvillians for all the delays.
+
+    The eigenvectors are shared across all the delays, and the diagonal matrices
+    of eigenvalue exponentials are applied by broadcasting instead of being
+    materialized.
+    """
 
-    for a_liouvillian in liouvillian.reshape(-1, *shape[-2:]):
-        s, vr = linalg.eig(a_liouvillian)
-        vri = linalg.inv(vr)
+    # A single delay does not benefit from the eigen-decomposition, the Padé
+    # approximant is cheaper and processes the whole block at once
+    if delays.size == 1 and not dephasing:
+        propagators = pade.expm(liouvillians * delays[0])[np.newaxis]
+        return propagators if mag0 is None else propagators @ mag0
 
-        if dephasing:
-            sl = np.where(abs(s.imag) < 1e-6)[0]
-            vr, s, vri = vr[:, sl], s[sl], vri[sl, :]
+    # All the Liouvillians of the block are diagonalized with a single call
+    s, vr = np.linalg.eig(liouvillians)
 
-        d = np.asarray([np.diag(np.exp(s * t)) for t in delays_])
+    exp_s = np.exp(np.multiply.outer(delays, s))
 
-        propagators.append((vr @ d @ vri).real)
+    # The oscillating components are discarded by zeroing their exponentials,
+    # which keeps the same number of eigenvalues for all the matrices
+    if dephasing:
+        exp_s *= abs(s.imag) < 1e-6
 
-    propagators = np.asarray(propagators).swapaxes(0, 1).reshape(-1, *shape)
+    if mag0 is None:
+        vri = np.linalg.inv(vr)
+        return ((vr * exp_s[..., np.newaxis, :]) @ vri).real
 
-    return propagators
+    # Scaling the rows of the (N, 1) vector avoids a scaled copy of vr
+    mag0 = np.broadcast_to(mag0, (*vr.shape[:-1], mag0.shape[-1]))
+    vri = np.linalg.solve(vr, mag0)
+    return (vr @ (exp_s[..., np.newaxis] * vri)).real
 
 
 def make_perfect180(vectors):
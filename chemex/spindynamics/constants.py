@@ -5,6 +5,7 @@ Define the gyromagnetic ratios in rad/s/T
 IUPAC values: Harris et al, Concepts in Magn. Reson., (2002) 14, p326
 """
 import collections
+import functools
 
 import numpy as np
 
@@ -160,8 +161,14 @@ J_COUPLING = {
 Distribution = collections.namedtuple("Distribution", ["values", "weights"])
 
 
+@functools.lru_cache(maxsize=None)
 def get_multiplet(symbol, nucleus):
-    """Calculate the multiplet pattern."""
+    """Calculate the multiplet pattern.
+
+    The pattern only depends on the residue type and the nucleus, so it is
+    calculated once and shared by all the profiles: the returned arrays are
+    read-only.
+    """
     multiplet = np.array([0.0])
     for coupling in J_COUPLING[symbol][nucleus]:
         doublet = coupling * 0.5 * np.array([-1.0, 1.0]).reshape(-1, 1)
@@ -169,4 +176,6 @@ def get_multiplet(symbol, nucleus):
     counter = collections.Counter(multiplet)
     values, weights = zip(*counter.items())
     distribution = Distribution(np.array(values), np.array(weights))
+    for array in distribution:
+        array.setflags(write=False)
     return distribution
@@ -0,0 +1,126 @@
+"""The pade module contains a matrix exponential for stacks of small matrices.
+
+The Liouvillians used in ChemEx are small (a few tens of rows at most), but
+many of them have to be exponentiated at once (e.g., one per B1 offset and per
+B1 inhomogeneity point). scipy.linalg.expm handles one matrix per call, so
+most of the time is spent in the Python layer rather than in the actual
+calculation. The implementation below follows the scaling and squaring
+algorithm of Higham, and works on the whole stack of matrices at once.
+
+Reference
+---------
+Higham. SIAM J Matrix Anal Appl (2005) 26:1179-1193
+"""
+import numpy as np
+
+# Maximal 1-norm for which the Padé approximant of order m is accurate to
+# double precision without scaling
+THETAS = {
+    3: 1.495585217958292e-02,
+    5: 2.539398330063230e-01,
+    7: 9.504178996162932e-01,
+    9: 2.097847961257068e00,
+    13: 5.371920351148152e00,
+}
+
+COEFFICIENTS = {
+    3: (120.0, 60.0, 12.0, 1.0),
+    5: (30240.0, 15120.0, 3360.0, 420.0, 30.0, 1.0),
+    7: (17297280.0, 8648640.0, 1995840.0, 277200.0, 25200.0, 1512.0, 56.0, 1.0),
+    9: (
+        17643225600.0,
+        8821612800.0,
+        2075673600.0,
+        302702400.0,
+        30270240.0,
+        2162160.0,
+        110880.0,
+        3960.0,
+        90.0,
+        1.0,
+    ),
+    13: (
+        64764752532480000.0,
+        32382376266240000.0,
+        7771770303897600.0,
+        1187353796428800.0,
+        129060195264000.0,
+        10559470521600.0,
+        670442572800.0,
+        33522128640.0,
+        1323241920.0,
+        40840800.0,
+        960960.0,
+        16380.0,
+        182.0,
+        1.0,
+    ),
+}
+
+
+def expm(matrices):
+    """Compute the matrix exponential of a stack of square matrices.
+
+    The same order and scaling are used for the whole stack, they are chosen
+    according to the matrix with the largest norm.
+    """
+
+    matrices = np.asarray(matrices)
+    norm = np.abs(matrices).sum(axis=-2).max(initial=0.0)
+
+    for order in (3, 5, 7, 9):
+        if norm <= THETAS[order]:
+            u, v = _pade_low(matrices, COEFFICIENTS[order])
+            return np.linalg.solve(v - u, v + u)
+
+    scaling = max(0, int(np.ceil(np.log2(norm / THETAS[13]))))
+    u, v = _pade13(matrices * 2.0 ** -scaling)
+    result = np.linalg.solve(v - u, v + u)
+
+    for _ in range(scaling):
+        result = result @ result
+
+    return result
+
+
+def _pade_low(a, b):
+    """Odd and even parts of the Padé approximant of order 3, 5, 7 or 9."""
+
+    ident = np.identity(a.shape[-1])
+    a2 = a @ a
+    power = ident
+    u = b[1] * ident
+    v = b[0] * ident
+
+    for index in range(2, len(b), 2):
+        power = power @ a2
+        u = u + b[index + 1] * power
+        v = v + b[index] * power
+
+    return a @ u, v
+
+
+def _pade13(a):
+    """Odd and even parts of the Padé approximant of order 13."""
+
+    b = COEFFICIENTS[13]
+    ident = np.identity(a.shape[-1])
+    a2 = a @ a
+    a4 = a2 @ a2
+    a6 = a2 @ a4
+    u = a @ (
+        a6 @ (b[13] * a6 + b[11] * a4 + b[9] * a2)
+        + b[7] * a6
+        + b[5] * a4
+        + b[3] * a2
+        + b[1] * ident
+    )
+    v = (
+        a6 @ (b[12] * a6 + b[10] * a4 + b[8] * a2)
+        + b[6] * a6
+        + b[4] * a4
+        + b[2] * a2
+        + b[0] * ident
+    )
+
+    return u, v
@@ -17,26 +17,25 @@ def compute_propagator_standard(liouvillian, time):
 def compute_propagator_beff(liouvillian, time):
     """TODO: function docstring."""
 
-    s, vr = linalg.eig(liouvillian)
-    vri = linalg.inv(vr)
+    s, vr = np.linalg.eig(liouvillian)
+    vri = np.linalg.inv(vr)
 
-    sl = np.where(abs(s.imag) < 1e-6)[0]
+    sl = abs(s.imag) < 1e-6
 
     vri = vri[sl, :]
-    diag = np.diag(np.exp(s[sl] * time))
-    vr = vr[:, sl]
+    vr = vr[:, sl] * np.exp(s[sl] * time)
 
-    return vr.dot(diag).dot(vri).real
+    return vr.dot(vri).real
 
 
 def compute_propagators_from_time_series(liouvillian, times):
     """TODO: function docstring."""
 
-    s, vr = linalg.eig(liouvillian)
-    vri = linalg.inv(vr)
+    s, vr = np.linalg.eig(liouvillian)
+    vri = np.linalg.inv(vr)
 
     propagators = {
-        t: vr.dot(np.diag(np.exp(s * t))).dot(vri).real
+        t: (vr * np.exp(s * t)).dot(vri).real
         for t in set(times)
         if abs(t) != np.inf
     }
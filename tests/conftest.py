@@ -0,0 +1,61 @@
+"""Shared fixtures for the tests of the matrix exponentials."""
+import numpy as np
+import pytest
+from scipy import linalg
+
+
+def build_liouvillians(norms, seed=0):
+    """Build 2-state Bloch-McConnell Liouvillians, {Ix, Iy, Iz} for each state,
+    scaled to the given 1-norms.
+
+    Offsets, B1 fields, relaxation rates and exchange rates are random. The
+    matrices have both oscillating and non-oscillating eigenvalues.
+    """
+    norms = np.asarray(norms, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    offsets = rng.uniform(-1.0, 1.0, (*norms.shape, 2))
+    w1 = rng.uniform(0.2, 1.0, (*norms.shape, 1))
+    r1 = rng.uniform(0.0, 0.05, (*norms.shape, 2))
+    r2 = rng.uniform(0.05, 0.2, (*norms.shape, 2))
+    kab, kba = rng.uniform(0.0, 0.5, (2, *norms.shape))
+
+    bloch = np.zeros((*norms.shape, 2, 3, 3))
+    bloch[..., 0, 0] = bloch[..., 1, 1] = -r2
+    bloch[..., 2, 2] = -r1
+    bloch[..., 1, 0] = offsets
+    bloch[..., 0, 1] = -offsets
+    bloch[..., 2, 1] = w1
+    bloch[..., 1, 2] = -w1
+
+    exchange = np.zeros((*norms.shape, 2, 2))
+    exchange[..., 0, 0] = -kab
+    exchange[..., 1, 0] = kab
+    exchange[..., 0, 1] = kba
+    exchange[..., 1, 1] = -kba
+
+    liouvillians = np.einsum("...ab,ij->...aibj", exchange, np.identity(3))
+    liouvillians = liouvillians.reshape(*norms.shape, 6, 6)
+    liouvillians[..., :3, :3] += bloch[..., 0, :, :]
+    liouvillians[..., 3:, 3:] += bloch[..., 1, :, :]
+
+    scales = norms / np.abs(liouvillians).sum(axis=-2).max(axis=-1)
+    return liouvillians * scales[..., np.newaxis, np.newaxis]
+
+
+def expm_scipy(matrices):
+    """scipy.linalg.expm applied to each matrix of the stack."""
+    matrices = np.asarray(matrices)
+    size = matrices.shape[-1]
+    results = [linalg.expm(matrix) for matrix in matrices.reshape(-1, size, size)]
+    return np.reshape(results, matrices.shape)
+
+
+@pytest.fixture(name="make_liouvillians")
+def fixture_make_liouvillians():
+    return build_liouvillians
+
+
+@pytest.fixture(name="expm_reference")
+def fixture_expm_reference():
+    return expm_scipy
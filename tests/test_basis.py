@@ -0,0 +1,55 @@
+"""Test the calculation of the propagators against scipy.linalg."""
+import numpy as np
+import pytest
+from scipy import linalg
+
+from chemex.spindynamics import basis
+
+SHAPE = (3, basis.STACK_BLOCK // 2 + 1)
+MAG0 = np.arange(1.0, 7.0).reshape(-1, 1)
+
+
+def dephased_reference(liouvillians, delays):
+    """Propagators without the oscillating components, with the eigenvectors of
+    the oscillating eigenvalues sliced out."""
+    propagators = []
+    for liouvillian in liouvillians.reshape(-1, 6, 6):
+        s, vr = linalg.eig(liouvillian)
+        vri = linalg.inv(vr)
+        keep = abs(s.imag) < 1e-6
+        vr, s, vri = vr[:, keep], s[keep], vri[keep, :]
+        propagators.append([(vr * np.exp(s * delay)) @ vri for delay in delays])
+    propagators = np.swapaxes(propagators, 0, 1).real
+    return propagators.reshape(len(delays), *liouvillians.shape)
+
+
+@pytest.mark.parametrize("delays", [[0.01], [0.001, 0.01, 0.05]])
+def test_propagators_blocks(delays, make_liouvillians, expm_reference):
+    """Stacks larger than STACK_BLOCK, with and without the magnetization."""
+    liouvillians = make_liouvillians(np.linspace(10.0, 2000.0, np.prod(SHAPE)))
+    liouvillians = liouvillians.reshape(*SHAPE, 6, 6)
+
+    reference = expm_reference(np.multiply.outer(delays, liouvillians))
+
+    propagators = basis.calculate_propagators(liouvillians, delays)
+    mag = basis.calculate_propagators(liouvillians, delays, mag0=MAG0)
+
+    assert propagators.shape == reference.shape
+    np.testing.assert_allclose(propagators, reference, rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(mag, reference @ MAG0, rtol=1e-8, atol=1e-12)
+
+
+@pytest.mark.parametrize("delays", [[0.05], [0.01, 0.05, 0.2]])
+def test_propagators_dephasing(delays, make_liouvillians):
+    """The zeroed exponentials of the oscillating components give the same
+    propagators as slicing out their eigenvectors."""
+    liouvillians = make_liouvillians(np.full(SHAPE, 100.0))
+
+    reference = dephased_reference(liouvillians, delays)
+
+    propagators = basis.calculate_propagators(liouvillians, delays, dephasing=True)
+    mag = basis.calculate_propagators(liouvillians, delays, True, mag0=MAG0)
+
+    assert propagators.shape == reference.shape
+    np.testing.assert_allclose(propagators, reference, rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(mag, reference @ MAG0, rtol=1e-8, atol=1e-12)
@@ -0,0 +1,59 @@
+"""Test the calculation of the CEST profiles."""
+import tracemalloc
+
+import numpy as np
+
+from chemex.experiments.cest import x_ip
+
+DETAILS = {
+    "name": "test",
+    "h_larmor_frq": 600.0,
+    "temperature": 25.0,
+    "time_t1": 0.5,
+    "carrier": 118.0,
+    "b1_frq": 25.0,
+    "b1_inh": 0.1,
+    "b1_inh_res": 11,
+    "cn_label": True,
+}
+
+
+def make_profile():
+    """Build a 2-state 15N CEST profile with B1 inhomogeneity and the 13C
+    multiplet."""
+    offsets = np.concatenate(([-4.0e4], np.linspace(-1000.0, 1000.0, 40)))
+    data = np.zeros(offsets.size, dtype=x_ip.ProfileCESTXIP.DTYPE)
+    data["offsets"] = offsets
+    data["intensity"] = 1.0
+    data["error"] = 0.01
+
+    profile = x_ip.ProfileCESTXIP("10N-HN", data, dict(DETAILS), "2st.pb_kex")
+
+    params = profile.params
+    for name, full_name in profile.map_names.items():
+        if name.startswith("cs_i_a"):
+            params[full_name].set(value=118.5)
+        elif name.startswith("dw_i_ab"):
+            params[full_name].set(value=3.0)
+    params.update_constraints()
+
+    return profile, params
+
+
+def test_profile_plot_offsets():
+    """The 500 points of the plotted profiles are calculated by blocks of
+    offsets: same values as point by point, and bounded memory."""
+    profile, params = make_profile()
+    offsets = np.linspace(-1200.0, 1200.0, 500)
+
+    tracemalloc.start()
+    values = profile.calculate_profile(params, offsets=offsets)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert values.shape == offsets.shape
+    assert peak < 16e6
+
+    for index in (0, 137, 250, 251, 499):
+        expected = profile.calculate_profile(params, offsets=offsets[[index]])
+        np.testing.assert_allclose(values[index], expected[0], rtol=1e-10)
@@ -0,0 +1,49 @@
+"""Test the batched matrix exponential against scipy.linalg.expm."""
+import numpy as np
+import pytest
+
+from chemex.spindynamics import pade
+
+
+@pytest.mark.parametrize("order", [3, 5, 7, 9, 13])
+def test_expm_orders(order, make_liouvillians, expm_reference):
+    """Each Padé order, without scaling."""
+    norm = 0.9 * pade.THETAS[order]
+    matrices = make_liouvillians([norm] * 4)
+    np.testing.assert_allclose(
+        pade.expm(matrices), expm_reference(matrices), rtol=1e-12, atol=1e-13
+    )
+
+
+@pytest.mark.parametrize("norm", [10.0, 100.0, 1000.0])
+def test_expm_scaling(norm, make_liouvillians, expm_reference):
+    """Order 13 with scaling and squaring."""
+    matrices = make_liouvillians([norm] * 4)
+    np.testing.assert_allclose(
+        pade.expm(matrices), expm_reference(matrices), rtol=1e-10, atol=1e-12
+    )
+
+
+def test_expm_mixed_norms(make_liouvillians, expm_reference):
+    """The whole stack is scaled according to its largest norm."""
+    matrices = make_liouvillians([1e-3, 0.1, 1.0, 50.0, 500.0])
+    np.testing.assert_allclose(
+        pade.expm(matrices), expm_reference(matrices), rtol=1e-10, atol=1e-12
+    )
+
+
+def test_expm_stack_shape(make_liouvillians, expm_reference):
+    """Stacks with several leading axes are handled."""
+    matrices = make_liouvillians([[0.5, 2.0, 8.0], [30.0, 0.01, 3.0]])
+    result = pade.expm(matrices)
+    assert result.shape == matrices.shape
+    np.testing.assert_allclose(
+        result, expm_reference(matrices), rtol=1e-10, atol=1e-12
+    )
+
+
+def test_expm_zero():
+    matrices = np.zeros((3, 4, 4))
+    np.testing.assert_array_equal(
+        pade.expm(matrices), np.broadcast_to(np.eye(4), (3, 4, 4))
+    )